@@ -5,96 +5,261 @@ Persona-Driven Document Intelligence
 """
 
 import argparse
+import functools
 import json
 import logging
+import multiprocessing
 import os
 import sys
+import threading
 import time
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    def _loads(data: bytes) -> Any:
+        """Parse UTF-8 encoded JSON with the stdlib parser"""
+        return json.loads(data.decode('utf-8'))
+
+# Directory containing this script, resolved once
+_HERE = Path(__file__).resolve().parent
 
 # Add src to Python path
-sys.path.append(str(Path(__file__).parent / "src"))
+sys.path.insert(0, str(_HERE / "src"))
+
+from src import PersonaDrivenProcessor
+from output_formatter import dumps_json
+from shared.config import OptimizedConfig
+
+
+@functools.lru_cache(maxsize=1)
+def _is_docker() -> bool:
+    """Detect if running in Docker by checking for Docker-specific environment"""
+    return os.path.exists('/.dockerenv') or os.environ.get('DOCKER_ENV') == 'true'
+
 
-# Configure logging
+# Configure logging; the container runtime already timestamps Docker logs
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    format='%(levelname)s %(message)s' if _is_docker() else '%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+# Processor used by pool workers: inherited from the parent when forked,
+# otherwise built once per worker by _init_worker
+_worker_processor = None
+
 
 def load_input_config(input_file: str) -> Dict[str, Any]:
     """Load the challenge1b_input.json configuration"""
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        with open(input_file, 'rb') as f:
+            config = _loads(f.read())
         
-        logger.info(f"Loaded input configuration from {input_file}")
+        logger.info("Loaded input configuration from %s", input_file)
         return config
     except Exception as e:
-        logger.error(f"Error loading input config: {e}")
+        logger.error("Error loading input config: %s", e)
+        raise
+
+
+def _atomic_write(path: Path, payload: bytes):
+    """Write payload to path, replacing any old file atomically"""
+    tmp = path.with_suffix('.tmp')
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            buf = memoryview(payload)
+            while buf:
+                buf = buf[os.write(fd, buf):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        # Do not leave a half-written temp file behind
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
         raise
 
 
 def display_banner():
     """Display the application banner"""
-    print("\n" + "="*70)
-    print("🎯 Adobe India Hackathon 2025 - Challenge 1b")
-    print("="*70)
-    print("🎯 Challenge 1b: Persona-Driven Document Intelligence")
-    print("="*70)
+    rule = "=" * 70
+    sys.stdout.write(
+        f"\n{rule}\n"
+        "🎯 Adobe India Hackathon 2025 - Challenge 1b\n"
+        f"{rule}\n"
+        "🎯 Challenge 1b: Persona-Driven Document Intelligence\n"
+        f"{rule}\n"
+    )
 
 
 def setup_directories():
     """Setup input and output directories - Docker compatible"""
     
-    # Detect if running in Docker by checking for Docker-specific environment
-    is_docker = os.path.exists('/.dockerenv') or os.environ.get('DOCKER_ENV') == 'true'
-    
-    if is_docker:
+    if _is_docker():
         # Docker paths - use standard container paths that match volume mounts
-        pdfs_dir = Path("/app/pdfs")
-        input_json_dir = Path("/app/input_json") 
-        output_dir = Path("/app/output")
-        
-        # Ensure directories exist in Docker
-        pdfs_dir.mkdir(parents=True, exist_ok=True)
-        input_json_dir.mkdir(parents=True, exist_ok=True)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        print(f"🐳 Docker mode: Using container paths")
-        print(f"📁 Input: {pdfs_dir}")
-        print(f"📤 Output: {output_dir}")
-        
+        base_dir = Path("/app")
+        mode_line = "🐳 Docker mode: Using container paths"
     else:
         # Local development paths - use relative to script
-        base_dir = Path(__file__).parent
-        
-        pdfs_dir = base_dir / "pdfs"
-        pdfs_dir.mkdir(exist_ok=True)
-        
-        input_json_dir = base_dir / "input_json"
-        input_json_dir.mkdir(exist_ok=True)
-        
-        output_dir = base_dir / "output"
-        output_dir.mkdir(exist_ok=True)
-        
-        print(f"💻 Local mode: Using relative paths")
-        print(f"📁 Input: {pdfs_dir}")
-        print(f"📤 Output: {output_dir}")
+        base_dir = _HERE
+        mode_line = "💻 Local mode: Using relative paths"
+    
+    pdfs_dir = base_dir / "pdfs"
+    input_json_dir = base_dir / "input_json"
+    output_dir = base_dir / "output"
+    
+    # Only create directories that are not already there
+    for directory in (pdfs_dir, input_json_dir, output_dir):
+        if not directory.is_dir():
+            directory.mkdir(parents=True, exist_ok=True)
+    
+    print(mode_line)
+    print(f"📁 Input: {pdfs_dir}")
+    print(f"📤 Output: {output_dir}")
     
     return str(pdfs_dir), str(output_dir), str(input_json_dir)
 
 
-def run_challenge_1b_from_config(config: Dict[str, Any], pdfs_dir: str, output_dir: str) -> bool:
+@functools.lru_cache(maxsize=4)
+def get_processor(persona: str, job: str) -> PersonaDrivenProcessor:
+    """Return a cached PersonaDrivenProcessor so models load once per process"""
+    return PersonaDrivenProcessor(persona=persona, job=job)
+
+
+def _init_worker(persona: str, job: str):
+    """Build one PersonaDrivenProcessor per worker process"""
+    global _worker_processor
+    _worker_processor = get_processor(persona, job)
+
+
+def _process_one(pdf_path: str, output_dir: str):
+    """Process a single PDF in a worker process, returning None on failure"""
+    try:
+        return _worker_processor.process_single_pdf(pdf_path, output_dir)
+    except Exception as e:
+        logger.error("Error processing %s: %s", os.path.basename(pdf_path), e)
+        return None
+
+
+def _prefetch(paths: List[str]):
+    """Ask the kernel to start reading the PDFs into the page cache ahead of parsing"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _cgroup_cpu_limit() -> Optional[int]:
+    """CPU quota of this container from cgroup v2 cpu.max or v1 CFS files, if one is set"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        try:
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                quota = f.read().strip()
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = f.read().strip()
+        except OSError:
+            return None
+    if quota in ('max', '-1'):
+        return None
+    try:
+        return max(1, int(quota) // int(period))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _available_cpus() -> int:
+    """Number of CPUs this process may use, honouring affinity masks and cgroup CPU quotas"""
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    return min(cpus, limit) if limit else cpus
+
+
+def _pdf_worker_count(num_docs: int) -> int:
+    """Number of worker processes used for PDF processing, never more than num_docs"""
+    requested = os.environ.get('PDF_WORKERS')
+    if requested is None:
+        # WORKERS (OptimizedConfig.max_workers), bounded by the CPUs actually available
+        workers = min(OptimizedConfig.load_optimized().max_workers, _available_cpus())
+    else:
+        try:
+            workers = int(requested)
+        except ValueError:
+            workers = 0
+        if workers <= 0:
+            raise ValueError(f"PDF_WORKERS must be a positive integer, got {requested!r}")
+    return max(1, min(num_docs, workers))
+
+
+def _existing_pdfs(pdfs_dir: str) -> Set[str]:
+    """Return the names of all files in pdfs_dir from a single directory scan"""
+    return {e.name for e in os.scandir(pdfs_dir) if e.is_file()}
+
+
+def _missing_pdfs(pdfs_dir: str, documents: List[Dict[str, Any]], present: Set[str]) -> List[str]:
+    """Return the config filenames not found in pdfs_dir, given the names from _existing_pdfs"""
+    return [doc["filename"] for doc in documents
+            if doc["filename"] not in present
+            and not _is_nested_pdf(pdfs_dir, doc["filename"])]
+
+
+def _is_nested_pdf(pdfs_dir: str, filename: str) -> bool:
+    """Check a filename with a subdirectory, which the top-level scan cannot see"""
+    has_sep = os.sep in filename or (os.altsep is not None and os.altsep in filename)
+    return has_sep and os.path.isfile(os.path.join(pdfs_dir, filename))
+
+
+def _list_pdfs(pdfs_dir: str) -> List[str]:
+    """Return the names of the PDF files in pdfs_dir"""
+    return [e.name for e in os.scandir(pdfs_dir) if e.name.endswith('.pdf') and e.is_file()]
+
+
+def _create_pool(processor: PersonaDrivenProcessor, persona: str, job: str, num_docs: int):
+    """Create the PDF worker pool, sharing the parent's loaded processor via fork on Linux"""
+    global _worker_processor
+    workers = _pdf_worker_count(num_docs)
+    if sys.platform == 'linux':
+        # Forked workers see the parent's processor copy-on-write, no reload needed;
+        # compile the similarity kernel first so they inherit that too
+        processor.embedding_model.warm_up()
+        _worker_processor = processor
+        return multiprocessing.get_context('fork').Pool(workers)
+    return multiprocessing.get_context('spawn').Pool(
+        workers, initializer=_init_worker, initargs=(persona, job)
+    )
+
+
+def run_challenge_1b_from_config(config: Dict[str, Any], pdfs_dir: str, output_dir: str,
+                                 known_present: Optional[Set[str]] = None) -> bool:
     """Run Challenge 1b using the input configuration"""
     try:
         print("\n🎯 Starting Challenge 1b - Persona-Driven Document Intelligence")
         print("-" * 50)
         
-        from src import PersonaDrivenProcessor
-        
         # Extract persona and job from config
         persona = config["persona"]["role"]
         job = config["job_to_be_done"]["task"]
@@ -104,61 +269,61 @@ def run_challenge_1b_from_config(config: Dict[str, Any], pdfs_dir: str, output_d
         print(f"💼 Job: {job}")
         print(f"📄 Documents: {len(documents)} files")
         
-        # Verify all PDF files exist
-        missing_files = []
-        for doc in documents:
-            pdf_path = Path(pdfs_dir) / doc["filename"]
-            if not pdf_path.exists():
-                missing_files.append(doc["filename"])
-        
-        if missing_files:
-            print(f"❌ Missing PDF files: {missing_files}")
-            print(f"📁 Please ensure all files are in {pdfs_dir}")
-            return False
+        # Verify all PDF files exist, unless the caller already did
+        if known_present is None:
+            known_present = _existing_pdfs(pdfs_dir)
+            missing_files = _missing_pdfs(pdfs_dir, documents, known_present)
+            
+            if missing_files:
+                print(f"❌ Missing PDF files: {missing_files}")
+                print(f"📁 Please ensure all files are in {pdfs_dir}")
+                return False
         
         # Initialize processor
-        processor = PersonaDrivenProcessor(persona=persona, job=job)
+        processor = get_processor(persona, job)
         
         # Process PDFs according to config
         start_time = time.time()
         
-        # Process each document specified in config
-        all_results = []
-        for doc in documents:
-            pdf_file = doc["filename"]
-            pdf_path = Path(pdfs_dir) / pdf_file
-            
-            print(f"📄 Processing: {doc['title']} ({pdf_file})")
-            
-            try:
-                # Process single PDF
-                result = processor.process_single_pdf(str(pdf_path), output_dir)
-                all_results.append((pdf_file, result))
-            except Exception as e:
-                logger.error(f"Error processing {pdf_file}: {e}")
-                all_results.append((pdf_file, None))
+        # Process documents in parallel, one processor per worker process
+        pdf_paths = [os.path.join(pdfs_dir, doc["filename"]) for doc in documents]
+        results = []
+        
+        with _create_pool(processor, persona, job, len(pdf_paths)) as pool:
+            # Warm the page cache in the background; started after the workers
+            # exist so nothing is forked while the thread is running
+            threading.Thread(target=_prefetch, args=(pdf_paths,), daemon=True).start()
+            # Results arrive in document order; report each one as it lands
+            for doc, result in zip(documents, pool.imap(
+                    functools.partial(_process_one, output_dir=output_dir), pdf_paths)):
+                print(f"📄 Processed: {doc['title']} ({doc['filename']})", flush=True)
+                results.append(result)
         
         processing_time = time.time() - start_time
         
         # Generate consolidated output in required format
-        processor.generate_consolidated_output(
-            all_results, 
+        output_data = processor.generate_consolidated_output(
+            results, 
             [doc["filename"] for doc in documents],
-            config,
-            output_dir
+            config
         )
+        if output_data is not None:
+            output_file = Path(output_dir) / "challenge1b_output.json"
+            _atomic_write(output_file, dumps_json(output_data))
+            logger.info("📄 Consolidated output saved to: %s", output_file)
         
         # Display results
-        print(f"\n✅ Challenge 1b completed in {processing_time:.2f} seconds")
-        print(f"📄 Processed {len(documents)} PDFs")
-        
-        success_count = sum(1 for _, result in all_results if result is not None)
-        print(f"✅ Successful: {success_count}/{len(documents)}")
+        success_count = len(results) - results.count(None)
+        sys.stdout.write(
+            f"\n✅ Challenge 1b completed in {processing_time:.2f} seconds\n"
+            f"📄 Processed {len(documents)} PDFs\n"
+            f"✅ Successful: {success_count}/{len(documents)}\n"
+        )
         
         return True
         
     except Exception as e:
-        logger.error(f"❌ Challenge 1b failed: {e}")
+        logger.error("❌ Challenge 1b failed: %s", e)
         return False
 
 
@@ -169,7 +334,7 @@ def run_docker_auto_mode(pdfs_dir: str, output_dir: str, args) -> bool:
         print("-" * 50)
         
         # Find all PDFs in the input directory
-        pdf_files = list(Path(pdfs_dir).glob("*.pdf"))
+        pdf_files = _list_pdfs(pdfs_dir)
         if not pdf_files:
             print(f"\n⚠️  No PDF files found in {pdfs_dir}")
             print("🐳 Mount PDFs to /app/input volume and try again")
@@ -188,8 +353,8 @@ def run_docker_auto_mode(pdfs_dir: str, output_dir: str, args) -> bool:
         documents = []
         for pdf_file in pdf_files:
             documents.append({
-                "filename": pdf_file.name,
-                "title": pdf_file.stem
+                "filename": pdf_file,
+                "title": os.path.splitext(pdf_file)[0]
             })
         
         config = {
@@ -203,26 +368,35 @@ def run_docker_auto_mode(pdfs_dir: str, output_dir: str, args) -> bool:
             "job_to_be_done": {"task": job}
         }
         
-        # Process using the synthetic config
-        return run_challenge_1b_from_config(config, pdfs_dir, output_dir)
+        # Process using the synthetic config; every document came from the scan above
+        return run_challenge_1b_from_config(config, pdfs_dir, output_dir,
+                                            known_present=set(pdf_files))
         
     except Exception as e:
-        logger.error(f"❌ Docker auto-processing failed: {e}")
+        logger.error("❌ Docker auto-processing failed: %s", e)
         return False
 
 
+# Status markers indexed by success flag
+_STATUS = ("❌", "✅")
+
+
 def run_challenge_1b(pdfs_dir: str, output_dir: str) -> bool:
     """Run Challenge 1b - Interactive mode (fallback)"""
     try:
         print("\n🎯 Starting Challenge 1b - Interactive Mode")
         print("-" * 50)
         
-        from src import PersonaDrivenProcessor
-        
         # Get persona and job if not set
         persona = os.getenv('PERSONA', '').strip()
         job = os.getenv('JOB', '').strip()
         
+        # Without a terminal input() would block forever (e.g. Docker, CI)
+        if (not persona or not job) and not sys.stdin.isatty():
+            logger.error("No persona/job provided and stdin is not a TTY")
+            print("❌ Set PERSONA and JOB (or pass --persona/--job) when running non-interactively")
+            return False
+        
         if not persona:
             print("\n👤 Please specify your persona/role:")
             print("Examples: Assistant Professor, Researcher, PhD Student, Data Scientist")
@@ -238,7 +412,7 @@ def run_challenge_1b(pdfs_dir: str, output_dir: str) -> bool:
             return False
         
         # Initialize processor
-        processor = PersonaDrivenProcessor(persona=persona, job=job)
+        processor = get_processor(persona, job)
         
         # Process PDFs
         start_time = time.time()
@@ -246,31 +420,39 @@ def run_challenge_1b(pdfs_dir: str, output_dir: str) -> bool:
         processing_time = time.time() - start_time
         
         # Display results
-        print(f"\n✅ Challenge 1b completed in {processing_time:.2f} seconds")
-        print(f"📄 Processed {len(results)} PDFs")
-        print(f"👤 Persona: {persona}")
-        print(f"💼 Job: {job}")
-        
-        for pdf_file, pdf_time, success in results:
-            status = "✅" if success else "❌"
-            print(f"   {status} {pdf_file}: {pdf_time:.2f}s")
+        lines = [
+            f"\n✅ Challenge 1b completed in {processing_time:.2f} seconds",
+            f"📄 Processed {len(results)} PDFs",
+            f"👤 Persona: {persona}",
+            f"💼 Job: {job}",
+        ]
+        lines.extend(f"   {_STATUS[bool(success)]} {pdf_file}: {pdf_time:.2f}s"
+                     for pdf_file, pdf_time, success in results)
+        sys.stdout.write("\n".join(lines) + "\n")
         
         return True
         
     except Exception as e:
-        logger.error(f"❌ Challenge 1b failed: {e}")
+        logger.error("❌ Challenge 1b failed: %s", e)
         return False
 
 
+_DEFAULT_INPUT = "challenge1b_input.json"
+
+_PARSER = argparse.ArgumentParser(description="Adobe Hackathon 2025 - Challenge 1b")
+_PARSER.add_argument("--input", default=_DEFAULT_INPUT, 
+                     help=f"Input JSON configuration file (default: {_DEFAULT_INPUT})")
+_PARSER.add_argument("--persona", help="Your persona/role (e.g., Assistant Professor)")
+_PARSER.add_argument("--job", help="Your specific task/job")
+
+
 def main():
     """Main entry point"""
-    parser = argparse.ArgumentParser(description="Adobe Hackathon 2025 - Challenge 1b")
-    parser.add_argument("--input", default="challenge1b_input.json", 
-                       help="Input JSON configuration file (default: challenge1b_input.json)")
-    parser.add_argument("--persona", help="Your persona/role (e.g., Assistant Professor)")
-    parser.add_argument("--job", help="Your specific task/job")
-    
-    args = parser.parse_args()
+    # Skip argument parsing entirely when no flags were given
+    if len(sys.argv) > 1:
+        args = _PARSER.parse_args()
+    else:
+        args = argparse.Namespace(input=_DEFAULT_INPUT, persona=None, job=None)
     
     # Display banner
     display_banner()
@@ -281,9 +463,6 @@ def main():
     # Try to load input configuration first
     input_config_path = Path(input_json_dir) / args.input
     
-    # Detect Docker mode
-    is_docker = os.path.exists('/.dockerenv') or os.environ.get('DOCKER_ENV') == 'true'
-    
     if input_config_path.exists():
         print(f"\n📋 Found input configuration: {args.input}")
         try:
@@ -291,16 +470,13 @@ def main():
             
             # Check if PDFs exist in pdfs directory
             documents = config.get("documents", [])
-            missing_files = []
-            for doc in documents:
-                pdf_path = Path(pdfs_dir) / doc["filename"]
-                if not pdf_path.exists():
-                    missing_files.append(doc["filename"])
+            present = _existing_pdfs(pdfs_dir)
+            missing_files = _missing_pdfs(pdfs_dir, documents, present)
             
             if missing_files:
                 print(f"\n⚠️  Missing PDF files: {missing_files}")
                 print(f"📁 Please ensure all files are in {pdfs_dir}")
-                if is_docker:
+                if _is_docker():
                     print("🐳 In Docker: Mount PDFs to /app/input volume")
                 return
             
@@ -308,13 +484,14 @@ def main():
             
             # Run challenge 1b with configuration
             overall_start = time.time()
-            success = run_challenge_1b_from_config(config, pdfs_dir, output_dir)
+            success = run_challenge_1b_from_config(config, pdfs_dir, output_dir,
+                                                   known_present=present)
             overall_time = time.time() - overall_start
             
         except Exception as e:
-            logger.error(f"Error with configuration file: {e}")
+            logger.error("Error with configuration file: %s", e)
             print(f"\n❌ Error loading configuration file.")
-            if is_docker:
+            if _is_docker():
                 print("🐳 Docker mode: Switching to auto-processing mode")
                 success = run_docker_auto_mode(pdfs_dir, output_dir, args)
                 overall_time = time.time() - overall_start
@@ -322,7 +499,7 @@ def main():
                 print("💻 Local mode: Falling back to interactive mode.")
                 success = False
     else:
-        if is_docker:
+        if _is_docker():
             # Docker auto-processing mode - process all PDFs in input directory
             print(f"\n🐳 Docker mode: No config found, auto-processing all PDFs")
             overall_start = time.time()
@@ -340,7 +517,7 @@ def main():
             os.environ['JOB'] = args.job
         
         # Check if PDFs exist in pdfs directory
-        pdf_files = list(Path(pdfs_dir).glob("*.pdf"))
+        pdf_files = _list_pdfs(pdfs_dir)
         if not pdf_files:
             print(f"\n⚠️  No PDF files found in {pdfs_dir}")
             print(f"📁 Please add PDF files to the pdfs directory and try again.")
@@ -354,17 +531,20 @@ def main():
         overall_time = time.time() - overall_start
     
     # Final summary
-    print("\n" + "="*70)
+    rule = "=" * 70
+    summary = [f"\n{rule}"]
     if success:
-        print("🎉 Challenge 1b completed successfully!")
-        print(f"📂 Results saved to: {Path(__file__).parent / 'output'}")
+        summary.append("🎉 Challenge 1b completed successfully!")
+        summary.append(f"📂 Results saved to: {_HERE / 'output'}")
         if input_config_path.exists():
-            print(f"📄 Output file: challenge1b_output.json")
+            summary.append("📄 Output file: challenge1b_output.json")
     else:
-        print("❌ Challenge 1b failed. Check logs for details.")
+        summary.append("❌ Challenge 1b failed. Check logs for details.")
     
-    print(f"⏱️  Total execution time: {overall_time:.2f} seconds")
-    print("="*70)
+    summary.append(f"⏱️  Total execution time: {overall_time:.2f} seconds")
+    summary.append(rule)
+    sys.stdout.write("\n".join(summary) + "\n")
+    sys.stdout.flush()
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ from functools import lru_cache
 from shared.config import OptimizedConfig  
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def _fast_similarity(a: np.ndarray, b: np.ndarray) -> float:
     """
     Compute cosine similarity between two vectors using JIT for speed.
@@ -23,6 +23,24 @@ def _fast_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return 0.0
 
 
+# Below this many rows the thread start-up of the parallel kernel costs more
+# than it saves; pool workers score one document at a time and stay serial
+_PARALLEL_MIN_ROWS = 64
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def _query_similarities(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Compute cosine similarity of every row in matrix against a single query vector,
+    spreading rows across threads.
+    """
+    n = matrix.shape[0]
+    scores = np.zeros(n)
+    for i in prange(n):
+        scores[i] = _fast_similarity(matrix[i], query)
+    return scores
+
+
 class EmbeddingModel:
     """
     Optimized TF-IDF processor with performance enhancements.
@@ -116,3 +134,31 @@ class EmbeddingModel:
             # Keep top-n if desired, or return full dict
             results.append({"id": ids[i], "similarities": sims})
         return results
+
+    def warm_up(self):
+        """
+        Compile (or load from the Numba cache) the serial similarity kernel, so
+        processes forked afterwards inherit it instead of each compiling it.
+        """
+        self.compute_query_similarities(np.ones((1, 1)), np.ones(1))
+
+    def compute_query_similarities(
+        self,
+        tfidf_matrix: np.ndarray,
+        query_vec: np.ndarray
+    ) -> np.ndarray:
+        """
+        Compute cosine similarity between each document vector and a query vector.
+
+        Args:
+            tfidf_matrix: 2D array where each row is a TF-IDF vector.
+            query_vec: 1D TF-IDF vector of the query.
+
+        Returns:
+            1D array of similarity scores, one per row of tfidf_matrix.
+        """
+        matrix = np.ascontiguousarray(tfidf_matrix)
+        query = np.ascontiguousarray(query_vec)
+        if matrix.shape[0] < _PARALLEL_MIN_ROWS:
+            return np.array([_fast_similarity(row, query) for row in matrix], dtype=np.float64)
+        return _query_similarities(matrix, query)
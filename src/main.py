@@ -72,26 +72,28 @@ class PersonaDrivenProcessor:
             logger.error(f"   ❌ Failed in {duration:.3f}s - Error: {str(e)}")
             return None
     
-    def generate_consolidated_output(self, all_results, input_documents, config, output_dir):
-        """Generate consolidated output in the required format"""
+    def generate_consolidated_output(self, results, input_documents, config):
+        """
+        Build consolidated output in the required format, or None on failure.
+        
+        results holds one process_single_pdf result per entry of input_documents,
+        with None for documents that failed.
+        """
         try:
-            # Extract successful results
-            successful_results = [result for result in all_results if result[1] is not None]
+            # Prepare document data for the output formatter from successful results
+            all_document_data = [
+                {
+                    'document': filename,
+                    'processed_doc': result.get('processed_doc', {}),
+                    'scored_sections': result.get('scored_sections', [])
+                }
+                for filename, result in zip(input_documents, results)
+                if result is not None
+            ]
             
-            if not successful_results:
+            if not all_document_data:
                 logger.error("No successful results to generate output")
-                return False
-            
-            # Prepare document data for the output formatter
-            all_document_data = []
-            for filename, result in successful_results:
-                if result:
-                    document_data = {
-                        'document': filename,
-                        'processed_doc': result.get('processed_doc', {}),
-                        'scored_sections': result.get('scored_sections', [])
-                    }
-                    all_document_data.append(document_data)
+                return None
             
             # Use the updated format_consolidated_output method
             output_data = self.output_formatter.format_consolidated_output(
@@ -102,16 +104,11 @@ class PersonaDrivenProcessor:
                 datetime.now()
             )
             
-            # Save as challenge1b_output.json
-            output_file = Path(output_dir) / "challenge1b_output.json"
-            self.output_formatter.save_json(output_data, output_file)
-            
-            logger.info(f"📄 Consolidated output saved to: {output_file}")
-            return True
+            return output_data
             
         except Exception as e:
             logger.error(f"Error generating consolidated output: {e}")
-            return False
+            return None
     
     def _extract_document_text(self, processed_doc: dict) -> str:
         """Extract all text content from a processed document"""
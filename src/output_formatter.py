@@ -2,14 +2,182 @@
 Output formatting module for JSON results.
 """
 
+import functools
+import io
 import json
 import logging
+import re
+from itertools import chain, islice
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
 logger = logging.getLogger(__name__)
 
+# Placeholder categories in priority order, each with one alternation of the
+# substrings that mark a lowercased filename as belonging to it. Business and
+# technology names never had their own placeholders and fall through to general.
+_PLACEHOLDER_CATEGORY_RES = (
+    ('food', re.compile('breakfast|lunch|dinner|food|recipe|meal')),
+    ('travel', re.compile('travel|trip|guide|city|place')),
+    ('research', re.compile('research|paper|study|analysis')),
+)
+_WS_RE = re.compile(r'\s+')
+
+# Maximum length of an extracted text excerpt, including the trailing ellipsis
+_MAX_TEXT_CHARS = 400
+
+# (substrings that must all appear in the lowercased filename, section title),
+# checked in order
+_SECTION_TITLE_RULES = (
+    (('create', 'convert'), "Creating and Converting Documents to PDF"),
+    (('edit',), "PDF Editing and Modification Tools"),
+    (('export',), "Exporting PDFs to Different Formats"),
+    (('fill', 'sign'), "Filling Forms and Adding Digital Signatures"),
+    (('generative', 'ai'), "AI-Powered Document Enhancement Features"),
+    (('signature',), "Send a document to get signatures from others"),
+    (('share',), "Document Sharing and Collaboration Methods"),
+    (('sharing', 'checklist'), "PDF Sharing Security and Compliance Checklist"),
+)
+
+# Fallback titles for any other documents, picked by document index
+_FALLBACK_SECTION_TITLES = (
+    "Acrobat Interface Overview",
+    "Document Processing Fundamentals",
+    "Advanced PDF Management",
+    "Workflow Optimization Techniques",
+    "Security and Compliance Features",
+)
+
+# Text shared by the recipe and food rules below
+_CULINARY_CONTEXT_TEXT = "Specialized culinary techniques and recipe modifications for {persona} working on {job}. Covers ingredient substitutions, scaling recipes for large groups, and quality control measures for professional catering services."
+
+# (substrings that must all appear in the lowercased filename, text template),
+# checked in order; templates take the lowercased persona and job
+_CONTEXT_TEXT_RULES = (
+    (('breakfast',), "Comprehensive breakfast menu options and recipes specifically curated for {persona} working on {job}. Includes vegetarian and gluten-free breakfast items, portion planning for corporate events, and nutritional considerations for morning meal service."),
+    (('lunch',), "Detailed lunch menu planning guide tailored for {persona} to execute {job}. Features light, nutritious options suitable for corporate gatherings, including sandwiches, salads, and hot dishes that accommodate various dietary restrictions."),
+    (('dinner', 'main'), "Essential dinner main course recipes and preparation guidelines for {persona} planning {job}. Focuses on substantial vegetarian entrees, protein alternatives, and presentation techniques for buffet-style corporate dining events."),
+    (('dinner', 'side'), "Comprehensive side dish collection and preparation methods for {persona} executing {job}. Includes complementary vegetables, starches, and accompaniments that enhance the main course while meeting vegetarian and gluten-free requirements."),
+    (('recipe',), _CULINARY_CONTEXT_TEXT),
+    (('food',), _CULINARY_CONTEXT_TEXT),
+)
+
+# Generic fallback text when no rule matches
+_FALLBACK_CONTEXT_TEXT = "Important information and practical guidelines for {persona} working on {job}. This section provides essential knowledge, best practices, and detailed procedures necessary for successful completion of the specified task."
+
+# Keys required in formatted output by validate_output
+_TOP_REQUIRED = frozenset({'metadata', 'sections'})
+_METADATA_REQUIRED = frozenset({'persona', 'job', 'datetime'})
+_SECTION_REQUIRED = frozenset({
+    'document', 'page', 'section_title',
+    'importance_rank', 'text', 'subsection_analysis'
+})
+_SUBSECTION_REQUIRED = frozenset({'subtext', 'score'})
+
+# Schema checked by validate_output
+_OUTPUT_SCHEMA = {
+    "type": "object",
+    "required": sorted(_TOP_REQUIRED),
+    "properties": {
+        "metadata": {
+            "type": "object",
+            "required": sorted(_METADATA_REQUIRED)
+        },
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": sorted(_SECTION_REQUIRED),
+                "properties": {
+                    "subsection_analysis": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "required": sorted(_SUBSECTION_REQUIRED)
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+# Compiled validator when fastjsonschema is installed, else the manual checks are used
+_schema_validator = fastjsonschema.compile(_OUTPUT_SCHEMA) if fastjsonschema else None
+
+# (scored section key, formatted section key) copied by format_output when non-empty
+_OPTIONAL_SECTION_FIELDS = (
+    ('key_phrases', 'key_phrases'),
+    ('score_breakdown', 'score_details'),
+)
+
+# Page numbers shown for the top five documents: cycling 1, 2, 3 for extracted
+# sections and odd pages for subsection analysis
+_PAGES_MOD3 = (1, 2, 3, 1, 2)
+_PAGES_ODD = (1, 3, 5, 7, 9)
+
+# Placeholder (template, page) entries per detected document category; templates
+# take the lowercased persona and job
+_PLACEHOLDER_TEMPLATES = {
+    'food': (
+        ("This section provides comprehensive information relevant to {persona} working on {job}. Key details include menu planning considerations, dietary restrictions, ingredient sourcing, and presentation tips essential for successful event catering.", 1),
+        ("Important guidelines and recommendations for {persona} to consider when {job}. This includes step-by-step food preparation processes, portion control, allergen management, and best practices for vegetarian and gluten-free options.", 2),
+        ("Advanced techniques and considerations for {persona} engaged in {job}. This section provides in-depth analysis of buffet service logistics, food safety protocols, and specialized knowledge for corporate catering events.", 3),
+    ),
+    'travel': (
+        ("This section provides comprehensive information relevant to {persona} working on {job}. Key details include planning considerations, practical tips, and essential information for successful execution of the specified task.", 1),
+        ("Important guidelines and recommendations for {persona} to consider when {job}. This includes step-by-step processes, best practices, and critical factors that contribute to achieving optimal results.", 2),
+    ),
+    'research': (
+        ("Research methodology and findings relevant to {persona} conducting {job}. This section outlines key research approaches, data analysis techniques, and significant discoveries that inform the research process.", 1),
+        ("Literature review and theoretical framework supporting {job}. Includes comprehensive analysis of existing research, identification of research gaps, and theoretical foundations for {persona}.", 3),
+    ),
+    'general': (
+        ("Essential information and guidelines for {persona} working on {job}. This section covers fundamental concepts, key principles, and practical approaches necessary for successful task completion.", 1),
+        ("Detailed procedures and best practices for {persona} to follow when {job}. Includes step-by-step instructions, common challenges, and proven strategies for achieving desired outcomes.", 2),
+        ("Advanced techniques and considerations for {persona} engaged in {job}. This section provides in-depth analysis, specialized knowledge, and expert recommendations for optimizing performance and results.", 3),
+    ),
+}
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize datetimes for the stdlib json fallback the way orjson does."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(data: Any) -> bytes:
+    """Serialize data to indent-2 UTF-8 JSON with a trailing newline."""
+    if orjson is not None:
+        return orjson.dumps(
+            data,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        )
+    # Serialize up front so callers can write the file in one go
+    return (json.dumps(data, indent=2, ensure_ascii=False, default=_json_default) + "\n").encode('utf-8')
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Return the stripped text of a chunk given as a dict or a plain string."""
+    if isinstance(chunk, dict):
+        return chunk.get('text', '').strip()
+    if isinstance(chunk, str):
+        return chunk.strip()
+    return ''
+
 
 class OutputFormatter:
     """Formats and saves analysis results to JSON."""
@@ -31,40 +199,21 @@ class OutputFormatter:
         Returns:
             Formatted output dictionary
         """
-        # Assign importance ranks
-        for i, section in enumerate(scored_sections):
-            section['importance_rank'] = i + 1
-        
         # Create metadata
         metadata = {
             "persona": persona,
             "job": job,
-            "datetime": timestamp.isoformat(),
+            "datetime": timestamp,
             "total_sections": len(scored_sections),
             "processing_version": self.output_schema_version,
             "score_threshold": 0.1
         }
         
-        # Format sections according to schema
-        formatted_sections = []
-        for section in scored_sections:
-            formatted_section = {
-                "document": section['document'],
-                "page": section['page'],
-                "section_title": section['section_title'],
-                "importance_rank": section['importance_rank'],
-                "text": section['text'],
-                "subsection_analysis": section.get('subsection_analysis', [])
-            }
-            
-            # Add optional fields if available
-            if 'key_phrases' in section and section['key_phrases']:
-                formatted_section['key_phrases'] = section['key_phrases']
-            
-            if 'score_breakdown' in section:
-                formatted_section['score_details'] = section['score_breakdown']
-            
-            formatted_sections.append(formatted_section)
+        # Format sections according to schema, ranked by their order
+        formatted_sections = [
+            self._format_section(i + 1, section)
+            for i, section in enumerate(scored_sections)
+        ]
         
         # Create final output
         output_data = {
@@ -72,9 +221,28 @@ class OutputFormatter:
             "sections": formatted_sections
         }
         
-        logger.info(f"Formatted output with {len(formatted_sections)} sections")
+        logger.info("Formatted output with %d sections", len(formatted_sections))
         return output_data
     
+    def _format_section(self, importance_rank: int, section: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a single scored section without modifying it."""
+        formatted_section = {
+            "document": section['document'],
+            "page": section['page'],
+            "section_title": section['section_title'],
+            "importance_rank": importance_rank,
+            "text": section['text'],
+            "subsection_analysis": section.get('subsection_analysis', [])
+        }
+        
+        # Add optional fields if available
+        for source_key, output_key in _OPTIONAL_SECTION_FIELDS:
+            value = section.get(source_key)
+            if value:
+                formatted_section[output_key] = value
+        
+        return formatted_section
+    
     def format_consolidated_output(self, all_document_data: List[Dict[str, Any]], 
                                  input_documents: List[str], persona: str, job: str, 
                                  timestamp: datetime) -> Dict[str, Any]:
@@ -96,155 +264,38 @@ class OutputFormatter:
             "input_documents": input_documents,
             "persona": persona,
             "job_to_be_done": job,
-            "processing_timestamp": timestamp.isoformat()
+            "processing_timestamp": timestamp
         }
         
-        # Create extracted sections - one per document with varied page numbers
-        extracted_sections = []
-        for i, doc_name in enumerate(input_documents[:5]):  # Top 5 documents
-            # Vary page numbers to show different pages from each document
-            page_num = (i % 3) + 1  # This gives us pages 1, 2, 3, 1, 2...
-            
-            # Generate more specific section titles based on document content
-            section_title = self._generate_section_title(doc_name, i)
-            
-            extracted_section = {
+        # Create extracted sections - one per top 5 document with varied page numbers
+        extracted_sections = [
+            {
                 "document": doc_name,
-                "section_title": section_title,
+                "section_title": self._generate_section_title(doc_name, i),
                 "importance_rank": i + 1,
-                "page_number": page_num
+                "page_number": _PAGES_MOD3[i]
             }
-            extracted_sections.append(extracted_section)
-        
-        # Create subsection analysis with real extracted text from different pages
-        subsection_analysis = []
+            for i, doc_name in enumerate(input_documents[:5])
+        ]
         
-        # Extract real content from each document
-        for i, doc_data in enumerate(all_document_data[:5]):  # Take first 5 documents for subsection analysis
-            if doc_data and 'processed_doc' in doc_data:
-                processed_doc = doc_data['processed_doc']
-                doc_name = doc_data['document']
-                
-                # Try to extract meaningful text from different pages
-                extracted_text = self._extract_meaningful_text_from_document(processed_doc, persona, job)
-                
-                if extracted_text:
-                    # Vary page numbers for more realistic output
-                    page_num = (i * 2) + 1  # This gives us pages 1, 3, 5, 7, 9...
-                    
-                    subsection = {
-                        "document": doc_name,
-                        "refined_text": extracted_text,
-                        "page_number": page_num
-                    }
-                    subsection_analysis.append(subsection)
-        
-        # If we don't have enough real content, supplement with context-aware content
-        if len(subsection_analysis) < 5:
-            remaining_docs = input_documents[len(subsection_analysis):]
-            for i, doc_name in enumerate(remaining_docs[:5-len(subsection_analysis)]):
-                page_num = ((len(subsection_analysis) + i) * 2) + 1
-                
-                # Create context-aware content based on document name and persona/job
-                context_text = self._generate_context_aware_text(doc_name, persona, job)
-                
-                subsection = {
-                    "document": doc_name,
-                    "refined_text": context_text,
-                    "page_number": page_num
-                }
-                subsection_analysis.append(subsection)
+        # Create subsection analysis: real extracted text first, then context-aware
+        # content for the remaining documents, up to five entries
+        real_subsections = list(self._iter_real_subsections(all_document_data, persona, job))
+        subsection_analysis = list(islice(
+            chain(
+                real_subsections,
+                self._iter_context_subsections(input_documents, persona, job, skip=len(real_subsections))
+            ),
+            5
+        ))
         
         # If we couldn't find enough actual content, create generic placeholder content
         # that can work for any document type and persona
         if len(subsection_analysis) < 3:
-            # Extract document types and create relevant placeholder content
-            doc_types = set()
-            for doc in input_documents:
-                doc_lower = doc.lower()
-                if any(word in doc_lower for word in ['breakfast', 'lunch', 'dinner', 'food', 'recipe', 'meal']):
-                    doc_types.add('food')
-                elif any(word in doc_lower for word in ['travel', 'trip', 'guide', 'city', 'place']):
-                    doc_types.add('travel')
-                elif any(word in doc_lower for word in ['research', 'paper', 'study', 'analysis']):
-                    doc_types.add('research')
-                elif any(word in doc_lower for word in ['business', 'finance', 'market', 'strategy']):
-                    doc_types.add('business')
-                elif any(word in doc_lower for word in ['tech', 'technology', 'software', 'development']):
-                    doc_types.add('technology')
-                else:
-                    doc_types.add('general')
-            
-            # Create context-appropriate content based on detected document types and persona
-            placeholder_content = []
-            
-            if 'food' in doc_types:
-                placeholder_content = [
-                    {
-                        "document": input_documents[0] if input_documents else "Document 1",
-                        "refined_text": f"This section provides comprehensive information relevant to {persona.lower()} working on {job.lower()}. Key details include menu planning considerations, dietary restrictions, ingredient sourcing, and presentation tips essential for successful event catering.",
-                        "page_number": 1
-                    },
-                    {
-                        "document": input_documents[1] if len(input_documents) > 1 else "Document 2", 
-                        "refined_text": f"Important guidelines and recommendations for {persona.lower()} to consider when {job.lower()}. This includes step-by-step food preparation processes, portion control, allergen management, and best practices for vegetarian and gluten-free options.",
-                        "page_number": 2
-                    },
-                    {
-                        "document": input_documents[2] if len(input_documents) > 2 else "Document 3",
-                        "refined_text": f"Advanced techniques and considerations for {persona.lower()} engaged in {job.lower()}. This section provides in-depth analysis of buffet service logistics, food safety protocols, and specialized knowledge for corporate catering events.",
-                        "page_number": 3
-                    }
-                ]
-            elif 'travel' in doc_types:
-                placeholder_content = [
-                    {
-                        "document": input_documents[0] if input_documents else "Document 1",
-                        "refined_text": f"This section provides comprehensive information relevant to {persona.lower()} working on {job.lower()}. Key details include planning considerations, practical tips, and essential information for successful execution of the specified task.",
-                        "page_number": 1
-                    },
-                    {
-                        "document": input_documents[1] if len(input_documents) > 1 else "Document 2", 
-                        "refined_text": f"Important guidelines and recommendations for {persona.lower()} to consider when {job.lower()}. This includes step-by-step processes, best practices, and critical factors that contribute to achieving optimal results.",
-                        "page_number": 2
-                    }
-                ]
-            elif 'research' in doc_types:
-                placeholder_content = [
-                    {
-                        "document": input_documents[0] if input_documents else "Document 1",
-                        "refined_text": f"Research methodology and findings relevant to {persona.lower()} conducting {job.lower()}. This section outlines key research approaches, data analysis techniques, and significant discoveries that inform the research process.",
-                        "page_number": 1
-                    },
-                    {
-                        "document": input_documents[1] if len(input_documents) > 1 else "Document 2",
-                        "refined_text": f"Literature review and theoretical framework supporting {job.lower()}. Includes comprehensive analysis of existing research, identification of research gaps, and theoretical foundations for {persona.lower()}.",
-                        "page_number": 3
-                    }
-                ]
-            else:
-                # Generic content that works for any domain
-                placeholder_content = [
-                    {
-                        "document": input_documents[0] if input_documents else "Document 1",
-                        "refined_text": f"Essential information and guidelines for {persona.lower()} working on {job.lower()}. This section covers fundamental concepts, key principles, and practical approaches necessary for successful task completion.",
-                        "page_number": 1
-                    },
-                    {
-                        "document": input_documents[1] if len(input_documents) > 1 else "Document 2",
-                        "refined_text": f"Detailed procedures and best practices for {persona.lower()} to follow when {job.lower()}. Includes step-by-step instructions, common challenges, and proven strategies for achieving desired outcomes.",
-                        "page_number": 2
-                    },
-                    {
-                        "document": input_documents[2] if len(input_documents) > 2 else "Document 3",
-                        "refined_text": f"Advanced techniques and considerations for {persona.lower()} engaged in {job.lower()}. This section provides in-depth analysis, specialized knowledge, and expert recommendations for optimizing performance and results.",
-                        "page_number": 3
-                    }
-                ]
-            
-            # Use placeholder content if we don't have enough real content
-            if len(subsection_analysis) < 3:
-                subsection_analysis.extend(placeholder_content[:5-len(subsection_analysis)])
+            subsection_analysis.extend(islice(
+                self._iter_placeholder_subsections(input_documents, persona, job),
+                5 - len(subsection_analysis)
+            ))
         
         # Create final consolidated output
         consolidated_output = {
@@ -253,38 +304,92 @@ class OutputFormatter:
             "subsection_analysis": subsection_analysis
         }
         
-        logger.info(f"Created consolidated output with {len(extracted_sections)} main sections and {len(subsection_analysis)} detailed subsections")
+        logger.info("Created consolidated output with %d main sections and %d detailed subsections",
+                    len(extracted_sections), len(subsection_analysis))
         return consolidated_output
     
+    def _iter_real_subsections(self, all_document_data: List[Dict[str, Any]],
+                               persona: str, job: str):
+        """Yield subsections with text extracted from the first five documents."""
+        for i, doc_data in enumerate(all_document_data[:5]):
+            if doc_data and 'processed_doc' in doc_data:
+                # Try to extract meaningful text from different pages
+                extracted_text = self._extract_meaningful_text_from_document(
+                    doc_data['processed_doc'], persona, job
+                )
+                
+                if extracted_text:
+                    # Vary page numbers for more realistic output
+                    yield {
+                        "document": doc_data['document'],
+                        "refined_text": extracted_text,
+                        "page_number": _PAGES_ODD[i]
+                    }
+    
+    def _iter_context_subsections(self, input_documents: List[str], persona: str, job: str,
+                                  skip: int):
+        """Yield context-aware subsections for the documents after the first skip ones."""
+        for i, doc_name in enumerate(input_documents[skip:]):
+            # Page numbers step by four, offset by the real subsections before them
+            yield {
+                "document": doc_name,
+                "refined_text": self._generate_context_aware_text(doc_name, persona, job),
+                "page_number": ((skip + 2 * i) * 2) + 1
+            }
+    
+    def _iter_placeholder_subsections(self, input_documents: List[str], persona: str, job: str):
+        """Yield generic placeholder subsections suited to the detected document types."""
+        # Pick the first category any document name mentions; names are joined
+        # so each pattern scans them in one search
+        names = "\n".join(input_documents).lower()
+        category = next(
+            (c for c, pattern in _PLACEHOLDER_CATEGORY_RES if pattern.search(names)), 'general'
+        )
+        p_low = persona.lower()
+        j_low = job.lower()
+        for i, (template, page_num) in enumerate(_PLACEHOLDER_TEMPLATES[category]):
+            yield {
+                "document": input_documents[i] if i < len(input_documents) else f"Document {i + 1}",
+                "refined_text": template.format(persona=p_low, job=j_low),
+                "page_number": page_num
+            }
+    
     def save_json(self, data: Dict[str, Any], output_path: Path):
         """Save formatted data to JSON file."""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(output_path, 'wb') as f:
+                f.write(dumps_json(data))
             
-            logger.info(f"Saved output to {output_path}")
+            logger.info("Saved output to %s", output_path)
             
         except Exception as e:
-            logger.error(f"Error saving JSON output: {str(e)}")
+            logger.error("Error saving JSON output: %s", e)
             raise
     
     def validate_output(self, data: Dict[str, Any]) -> bool:
         """Validate output data against expected schema."""
+        if _schema_validator is not None:
+            try:
+                _schema_validator(data)
+            except fastjsonschema.JsonSchemaException as e:
+                logger.error("Output validation failed: %s", e.message)
+                return False
+            
+            logger.info("Output validation passed")
+            return True
+        
         try:
             # Check required top-level keys
-            required_keys = ['metadata', 'sections']
-            for key in required_keys:
-                if key not in data:
-                    logger.error(f"Missing required key: {key}")
-                    return False
+            missing = _TOP_REQUIRED - data.keys()
+            if missing:
+                logger.error("Missing required keys: %s", sorted(missing))
+                return False
             
             # Check metadata
-            metadata = data['metadata']
-            metadata_required = ['persona', 'job', 'datetime']
-            for key in metadata_required:
-                if key not in metadata:
-                    logger.error(f"Missing metadata key: {key}")
-                    return False
+            missing = _METADATA_REQUIRED - data['metadata'].keys()
+            if missing:
+                logger.error("Missing metadata keys: %s", sorted(missing))
+                return False
             
             # Check sections
             sections = data['sections']
@@ -294,36 +399,31 @@ class OutputFormatter:
             
             # Check each section
             for i, section in enumerate(sections):
-                section_required = [
-                    'document', 'page', 'section_title', 
-                    'importance_rank', 'text', 'subsection_analysis'
-                ]
-                
-                for key in section_required:
-                    if key not in section:
-                        logger.error(f"Section {i} missing required key: {key}")
-                        return False
+                missing = _SECTION_REQUIRED - section.keys()
+                if missing:
+                    logger.error("Section %d missing required keys: %s", i, sorted(missing))
+                    return False
                 
                 # Check subsection_analysis format
                 subsections = section['subsection_analysis']
                 if not isinstance(subsections, list):
-                    logger.error(f"Section {i} subsection_analysis must be a list")
+                    logger.error("Section %d subsection_analysis must be a list", i)
                     return False
                 
                 for j, subsection in enumerate(subsections):
                     if not isinstance(subsection, dict):
-                        logger.error(f"Section {i} subsection {j} must be a dict")
+                        logger.error("Section %d subsection %d must be a dict", i, j)
                         return False
                     
-                    if 'subtext' not in subsection or 'score' not in subsection:
-                        logger.error(f"Section {i} subsection {j} missing required keys")
+                    if not _SUBSECTION_REQUIRED <= subsection.keys():
+                        logger.error("Section %d subsection %d missing required keys", i, j)
                         return False
             
             logger.info("Output validation passed")
             return True
             
         except Exception as e:
-            logger.error(f"Error validating output: {str(e)}")
+            logger.error("Error validating output: %s", e)
             return False
     
     def create_summary_report(self, data: Dict[str, Any]) -> str:
@@ -332,45 +432,36 @@ class OutputFormatter:
             metadata = data['metadata']
             sections = data['sections']
             
-            report_lines = [
-                "=== DOCUMENT ANALYSIS SUMMARY ===",
-                f"Persona: {metadata['persona']}",
-                f"Job/Task: {metadata['job']}",
-                f"Processing Time: {metadata['datetime']}",
-                f"Total Relevant Sections: {len(sections)}",
-                "",
-                "=== TOP SECTIONS BY RELEVANCE ===",
-                ""
-            ]
+            buf = io.StringIO()
+            w = buf.write
+            w("=== DOCUMENT ANALYSIS SUMMARY ===\n")
+            w(f"Persona: {metadata['persona']}\n")
+            w(f"Job/Task: {metadata['job']}\n")
+            timestamp = metadata['datetime']
+            if isinstance(timestamp, datetime):
+                timestamp = timestamp.isoformat()
+            w(f"Processing Time: {timestamp}\n")
+            w(f"Total Relevant Sections: {len(sections)}\n")
+            w("\n=== TOP SECTIONS BY RELEVANCE ===\n\n")
             
             # Show top 10 sections
             for i, section in enumerate(sections[:10]):
-                report_lines.extend([
-                    f"{i+1}. {section['section_title']} (Page {section['page']})",
-                    f"   Document: {section['document']}",
-                    f"   Text Preview: {section['text'][:100]}...",
-                    f"   Subsections: {len(section['subsection_analysis'])}",
-                    ""
-                ])
+                w(f"{i+1}. {section['section_title']} (Page {section['page']})\n")
+                w(f"   Document: {section['document']}\n")
+                w(f"   Text Preview: {section['text'][:100]}...\n")
+                w(f"   Subsections: {len(section['subsection_analysis'])}\n\n")
             
             # Document distribution
-            doc_counts = {}
-            for section in sections:
-                doc = section['document']
-                doc_counts[doc] = doc_counts.get(doc, 0) + 1
-            
-            report_lines.extend([
-                "=== DOCUMENT DISTRIBUTION ===",
-                ""
-            ])
+            doc_counts = Counter(section['document'] for section in sections)
             
+            w("=== DOCUMENT DISTRIBUTION ===\n")
             for doc, count in sorted(doc_counts.items()):
-                report_lines.append(f"{doc}: {count} relevant sections")
+                w(f"\n{doc}: {count} relevant sections")
             
-            return "\n".join(report_lines)
+            return buf.getvalue()
             
         except Exception as e:
-            logger.error(f"Error creating summary report: {str(e)}")
+            logger.error("Error creating summary report: %s", e)
             return "Error generating summary report"
     
     def _extract_meaningful_text_from_document(self, processed_doc: Dict[str, Any], persona: str, job: str) -> str:
@@ -383,7 +474,6 @@ class OutputFormatter:
             if 'chunks' in processed_doc and processed_doc['chunks']:
                 # Take text from multiple chunks to get varied content
                 chunks = processed_doc['chunks']
-                selected_chunks = []
                 
                 # Select chunks from different parts of the document
                 if len(chunks) >= 3:
@@ -392,24 +482,24 @@ class OutputFormatter:
                 else:
                     selected_chunks = chunks
                 
-                # Combine text from selected chunks
-                chunk_texts = []
-                for chunk in selected_chunks:
-                    if isinstance(chunk, dict) and 'text' in chunk:
-                        chunk_text = chunk['text'].strip()
-                        if len(chunk_text) > 50:  # Only include substantial text
-                            chunk_texts.append(chunk_text)
-                    elif isinstance(chunk, str):
-                        chunk_text = chunk.strip()
-                        if len(chunk_text) > 50:
-                            chunk_texts.append(chunk_text)
+                # Combine text from selected chunks, keeping only as much of each
+                # as can survive the final length limit. Chunks can carry runs of
+                # whitespace, so collapse them before cutting, and keep one spare
+                # character in case the cut ends on a space that strip() removes.
+                chunk_texts = [
+                    _WS_RE.sub(' ', chunk_text)[:_MAX_TEXT_CHARS + 2]
+                    for chunk in selected_chunks
+                    if len(chunk_text := _chunk_text(chunk)) > 50  # Only include substantial text
+                ]
                 
                 if chunk_texts:
                     text_content = " ".join(chunk_texts[:3])  # Limit to 3 chunks
             
             # If no chunked text, try to get raw text
             if not text_content and 'text' in processed_doc:
-                raw_text = processed_doc['text'].strip()
+                # Slice the excerpt straight from the full text rather than copying
+                # the whole document through strip() first
+                raw_text = processed_doc['text']
                 if len(raw_text) > 100:
                     # Take a meaningful excerpt from the middle of the document
                     start_pos = len(raw_text) // 4
@@ -419,68 +509,43 @@ class OutputFormatter:
             # Clean and limit the text
             if text_content:
                 # Remove excessive whitespace and newlines
-                text_content = ' '.join(text_content.split())
+                text_content = _WS_RE.sub(' ', text_content).strip()
                 # Limit length to reasonable size
-                if len(text_content) > 400:
-                    text_content = text_content[:400] + "..."
+                if len(text_content) > _MAX_TEXT_CHARS:
+                    text_content = text_content[:_MAX_TEXT_CHARS - 3] + "..."
                 
                 return text_content
             
             return None
             
         except Exception as e:
-            logger.warning(f"Error extracting text from document: {str(e)}")
+            logger.warning("Error extracting text from document: %s", e)
             return None
     
-    def _generate_context_aware_text(self, doc_name: str, persona: str, job: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _generate_context_aware_text(doc_name: str, persona: str, job: str) -> str:
         """Generate context-aware text based on document name and persona/job."""
         doc_lower = doc_name.lower()
         
         # Analyze document name to determine content type
-        if 'breakfast' in doc_lower:
-            return f"Comprehensive breakfast menu options and recipes specifically curated for {persona.lower()} working on {job.lower()}. Includes vegetarian and gluten-free breakfast items, portion planning for corporate events, and nutritional considerations for morning meal service."
-        elif 'lunch' in doc_lower:
-            return f"Detailed lunch menu planning guide tailored for {persona.lower()} to execute {job.lower()}. Features light, nutritious options suitable for corporate gatherings, including sandwiches, salads, and hot dishes that accommodate various dietary restrictions."
-        elif 'dinner' in doc_lower and 'main' in doc_lower:
-            return f"Essential dinner main course recipes and preparation guidelines for {persona.lower()} planning {job.lower()}. Focuses on substantial vegetarian entrees, protein alternatives, and presentation techniques for buffet-style corporate dining events."
-        elif 'dinner' in doc_lower and 'side' in doc_lower:
-            return f"Comprehensive side dish collection and preparation methods for {persona.lower()} executing {job.lower()}. Includes complementary vegetables, starches, and accompaniments that enhance the main course while meeting vegetarian and gluten-free requirements."
-        elif 'recipe' in doc_lower or 'food' in doc_lower:
-            return f"Specialized culinary techniques and recipe modifications for {persona.lower()} working on {job.lower()}. Covers ingredient substitutions, scaling recipes for large groups, and quality control measures for professional catering services."
-        else:
-            # Generic fallback
-            return f"Important information and practical guidelines for {persona.lower()} working on {job.lower()}. This section provides essential knowledge, best practices, and detailed procedures necessary for successful completion of the specified task."
+        template = _FALLBACK_CONTEXT_TEXT
+        for keys, text in _CONTEXT_TEXT_RULES:
+            if all(k in doc_lower for k in keys):
+                template = text
+                break
+        
+        return template.format(persona=persona.lower(), job=job.lower())
 
-    def _generate_section_title(self, doc_name: str, index: int) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _generate_section_title(doc_name: str, index: int) -> str:
         """Generate specific section titles based on document names."""
         doc_lower = doc_name.lower()
         
         # Analyze document name to determine appropriate section title
-        if 'create' in doc_lower and 'convert' in doc_lower:
-            return "Creating and Converting Documents to PDF"
-        elif 'edit' in doc_lower:
-            return "PDF Editing and Modification Tools"
-        elif 'export' in doc_lower:
-            return "Exporting PDFs to Different Formats"
-        elif 'fill' in doc_lower and 'sign' in doc_lower:
-            return "Filling Forms and Adding Digital Signatures"
-        elif 'generative' in doc_lower and 'ai' in doc_lower:
-            return "AI-Powered Document Enhancement Features"
-        elif 'e-signatures' in doc_lower or 'signature' in doc_lower:
-            return "Send a document to get signatures from others"
-        elif 'share' in doc_lower:
-            return "Document Sharing and Collaboration Methods"
-        elif 'export' in doc_lower and 'skills' in doc_lower:
-            return "Advanced Export Techniques and Best Practices"
-        elif 'sharing' in doc_lower and 'checklist' in doc_lower:
-            return "PDF Sharing Security and Compliance Checklist"
-        else:
-            # Fallback titles for any other documents
-            titles = [
-                "Acrobat Interface Overview",
-                "Document Processing Fundamentals", 
-                "Advanced PDF Management",
-                "Workflow Optimization Techniques",
-                "Security and Compliance Features"
-            ]
-            return titles[index % len(titles)]
+        for keys, title in _SECTION_TITLE_RULES:
+            if all(k in doc_lower for k in keys):
+                return title
+        
+        return _FALLBACK_SECTION_TITLES[index % len(_FALLBACK_SECTION_TITLES)]
@@ -35,12 +35,11 @@ class RelevanceScorer:
         persona_vec = matrix[-1]
         doc_matrix = matrix[:-1]
 
-        # Compute similarity scores
-        similarities = self.embedding_model.compute_similarities(doc_matrix, doc_ids)
-        # Extract only the score for persona
+        # Compute similarity of every document against the persona in one JIT pass
+        scores = self.embedding_model.compute_query_similarities(doc_matrix, persona_vec)
         scored = [
-            {"id": sim["id"], "score": sim["similarities"].get(sim["id"], 0.0)}
-            for sim in similarities
+            {"id": doc_id, "score": float(score)}
+            for doc_id, score in zip(doc_ids, scores)
         ]
         # Sort by descending score
         scored.sort(key=lambda x: x["score"], reverse=True)
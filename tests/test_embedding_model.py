@@ -0,0 +1,54 @@
+"""
+Tests for the Numba similarity kernels in embedding_model.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("numba")
+pytest.importorskip("sklearn")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from embedding_model import EmbeddingModel, _PARALLEL_MIN_ROWS  # noqa: E402
+
+
+def _numpy_cosine(matrix, query):
+    """Reference cosine similarity of every row against query, 0.0 for zero vectors"""
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    dots = matrix @ query
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+
+@pytest.mark.parametrize("rows", [1, _PARALLEL_MIN_ROWS, _PARALLEL_MIN_ROWS * 2 + 1])
+def test_compute_query_similarities_matches_numpy(rows):
+    rng = np.random.default_rng(rows)
+    matrix = rng.random((rows, 32))
+    matrix[0] = 0.0  # a document with no terms scores 0.0
+    query = rng.random(32)
+
+    scores = EmbeddingModel().compute_query_similarities(matrix, query)
+
+    assert scores.shape == (rows,)
+    np.testing.assert_allclose(scores, _numpy_cosine(matrix, query), rtol=1e-12, atol=1e-12)
+
+
+def test_compute_query_similarities_accepts_non_contiguous_input():
+    rng = np.random.default_rng(0)
+    matrix = rng.random((32, 3)).T
+    query = rng.random(64)[::2]
+
+    scores = EmbeddingModel().compute_query_similarities(matrix, query)
+
+    np.testing.assert_allclose(scores, _numpy_cosine(matrix, query), rtol=1e-12, atol=1e-12)
+
+
+def test_warm_up_compiles_serial_kernel():
+    from embedding_model import _fast_similarity
+
+    EmbeddingModel().warm_up()
+
+    assert _fast_similarity.signatures